@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from dataset import CRIME_TYPES, district_rows
+
+# Modified z-score cutoff from Iglewicz and Hoaglin
+ROBUST_Z_THRESHOLD = 3.5
+# A count appearing in this many crime columns of one row. Small counts
+# such as 1 or 2 repeat naturally, so only values of at least
+# REPEATED_VALUE_MIN are considered.
+REPEATED_VALUE_THRESHOLD = 5
+REPEATED_VALUE_MIN = 10
+# Allowed relative gap between Total_Crimes and the sum of the columns
+TOTAL_MISMATCH_TOLERANCE = 0.01
+
+
+def detect_anomalies(df, crime_columns=None):
+    """Flag data-quality outliers in every row of the crime dataset.
+
+    All checks run over the whole (row x crime type) matrix at once:
+    - robust z-scores of log counts per column, using median and MAD
+    - the same non-trivial value repeated across many crime columns in a row
+    - Total_Crimes disagreeing with the sum of the crime columns
+
+    Returns a frame aligned with df with one boolean column per check,
+    summary scores per row, and an overall is_anomaly flag.
+    """
+    crime_columns = [c for c in (crime_columns or CRIME_TYPES) if c in df.columns]
+    values = df[crime_columns].to_numpy(dtype=float)
+    # Per-state aggregate rows are sums, not districts, and are not scored
+    is_aggregate = ~district_rows(df).to_numpy()
+
+    # Robust z-scores on log counts, with statistics from district rows only
+    logs = np.log1p(np.clip(np.nan_to_num(values), 0, None))
+    district_logs = np.where(is_aggregate[:, None], np.nan, logs)
+    median = np.nanmedian(district_logs, axis=0)
+    mad = np.nanmedian(np.abs(district_logs - median), axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        robust_z = np.where(mad > 0, 0.6745 * (logs - median) / mad, 0.0)
+    outlier_cells = np.abs(robust_z) > ROBUST_Z_THRESHOLD
+
+    # How many columns in the row share each cell's value
+    same_value = (values[:, :, None] == values[:, None, :]).sum(axis=2)
+    same_value = np.where(values >= REPEATED_VALUE_MIN, same_value, 0)
+    max_repeat = same_value.max(axis=1) if crime_columns else np.zeros(len(df))
+
+    if 'Total_Crimes' in df.columns:
+        total = df['Total_Crimes'].to_numpy(dtype=float)
+        column_sum = np.nansum(values, axis=1)
+        total_gap = total - column_sum
+        total_mismatch = np.abs(total_gap) > np.maximum(1, TOTAL_MISMATCH_TOLERANCE * np.abs(total))
+    else:
+        total_gap = np.zeros(len(df))
+        total_mismatch = np.zeros(len(df), dtype=bool)
+
+    outlier_columns = [
+        [crime_columns[j] for j in np.flatnonzero(row)] for row in outlier_cells
+    ]
+
+    result = pd.DataFrame({
+        'States/UTs': df['States/UTs'].to_numpy(),
+        'District': df['District'].to_numpy(),
+        'Year': df['Year'].to_numpy(),
+        'is_aggregate': is_aggregate,
+        'outlier': outlier_cells.any(axis=1) & ~is_aggregate,
+        'outlier_columns': outlier_columns,
+        'max_robust_z': np.abs(robust_z).max(axis=1) if crime_columns else 0.0,
+        'repeated_value': (max_repeat >= REPEATED_VALUE_THRESHOLD) & ~is_aggregate,
+        'max_repeat': max_repeat,
+        'total_mismatch': total_mismatch,
+        'total_gap': total_gap,
+    }, index=df.index)
+    result['is_anomaly'] = result['outlier'] | result['repeated_value'] | result['total_mismatch']
+    return result
+
+
+def anomaly_records(anomalies, state='All', check=None, limit=100):
+    """Anomalous rows as JSON-ready records, most extreme first"""
+    rows = anomalies[anomalies['is_anomaly']]
+    if state != 'All':
+        rows = rows[rows['States/UTs'] == state]
+    if check in ('outlier', 'repeated_value', 'total_mismatch'):
+        rows = rows[rows[check]]
+    rows = rows.sort_values(['max_repeat', 'max_robust_z'], ascending=False).head(limit)
+
+    records = []
+    for row in rows.rename(columns={'States/UTs': 'State'}).itertuples(index=False):
+        reasons = [name for name in ('outlier', 'repeated_value', 'total_mismatch')
+                   if getattr(row, name)]
+        records.append({
+            'state': row.State,
+            'district': row.District,
+            'year': int(row.Year),
+            'reasons': reasons,
+            'outlier_columns': row.outlier_columns,
+            'max_robust_z': round(float(row.max_robust_z), 2),
+            'max_repeat': int(row.max_repeat),
+            'total_gap': float(row.total_gap)
+        })
+    return records
@@ -1,27 +1,96 @@
-from flask import Flask, render_template, request, jsonify
+import os
+import json
+from flask import Flask, render_template, request, jsonify, Response
 import pandas as pd
 import numpy as np
-import joblib
-from ml_model import train_crime_model, predict_crime, get_crime_insights
-import folium
-from geopy.geocoders import Nominatim
-import json
+from ml_model import (train_crime_model, predict_crime, get_crime_insights,
+                      start_background_warm_up, get_model_stats, SingleFlight)
+from forecasting import CrimeForecaster, get_crime_forecast
+from district_matching import DistrictMatcher
+from spatial_stats import SpatialHotspots
+from anomalies import detect_anomalies, anomaly_records
+from storage import create_storage, PandasStorage
+from distribution import DistributionIndex, get_crime_distribution
+from dataset import (CRIME_TYPES, CRIME_COLUMNS, DATA_PATH, COORDINATES_PATH,
+                     district_rows, is_aggregate_name, is_non_territorial)
+from map_cache import MapCache, dataset_version, hotspot_markers, render_hotspot_map
 
 app = Flask(__name__)
 
-# Load datasets
-df = pd.read_csv('data/crime_data.csv')
+# All dataset access goes through the storage backend. Set
+# CRIME_STORAGE=sqlite to push filters and group-bys down to an indexed
+# SQLite database, so the full dataset is never read into memory.
+store = create_storage(os.environ.get('CRIME_STORAGE', 'pandas'))
 
 # Load district coordinates
-district_coords_df = pd.read_csv('data/district_coordinates.csv')
+district_coords_df = pd.read_csv(COORDINATES_PATH)
+
+STATES = store.distinct('States/UTs')
+DISTRICTS = store.distinct('District')
+YEARS = store.distinct('Year')
+
+# The indexes below grow with the dataset. The pandas backend holds the
+# whole dataset anyway, so they are built up front. With SQLite they are
+# not kept: forecasts and distributions read only the requested district
+# or scope, and the anomaly checks, which score every row, are opt-in with
+# CRIME_SQLITE_ANOMALIES=1 and built on first use.
+PRELOAD_INDEXES = isinstance(store, PandasStorage)
+ANOMALY_CHECKS = PRELOAD_INDEXES or os.environ.get('CRIME_SQLITE_ANOMALIES') == '1'
+
+anomalies = None
+distribution_index = None
+forecaster = None
+if PRELOAD_INDEXES:
+    # Flag data-quality outliers across the whole dataset
+    anomalies = detect_anomalies(store.df)
+
+    # Presorted per-scope values for percentile and rank queries
+    distribution_index = DistributionIndex(store.df)
+
+    # Fit trend forecasts for every district and crime type up front
+    forecaster = CrimeForecaster().fit(store.df)
+
+# Indexes built on first use; concurrent first requests share one build
+index_flight = SingleFlight()
+
+def get_anomalies():
+    """Anomaly flags for every row, or None when the checks are off"""
+    def load():
+        global anomalies
+        if anomalies is None:
+            anomalies = detect_anomalies(store.rows())
+        return anomalies
+
+    if anomalies is None and ANOMALY_CHECKS:
+        return index_flight.do('anomalies', load)
+    return anomalies
+
+def get_distribution_index(crime_type, state, year):
+    """The preloaded distribution index, or one over just the requested scope"""
+    if distribution_index is not None:
+        return distribution_index
+    filters = {'States/UTs': None if state == 'All' else state,
+               'Year': None if year == 'All' else int(year)}
+    columns = ['States/UTs', 'District', 'Year'] + [c for c in [crime_type] if c in store.columns]
+    return DistributionIndex(store.rows(filters, columns), [crime_type])
 
-# Crime types from dataset
-CRIME_TYPES = ['Murder', 'Rape', 'Kidnapping', 'Dacoity', 'Burglary', 'Theft', 
-              'Riots', 'Forgery', 'Counterfeiting', 'Arson', 'Acid attack', 
-              'Dowry Deaths', 'Stalking']
+def get_forecaster(state, district):
+    """The preloaded forecaster, or one fitted on just the requested district"""
+    if forecaster is not None:
+        return forecaster
+    rows = store.rows({'States/UTs': state, 'District': district})
+    return CrimeForecaster().fit(rows, years=YEARS)
 
-STATES = sorted(df['States/UTs'].unique())
-DISTRICTS = sorted(df['District'].unique())
+# Server-side rendered hotspot maps, keyed by filters and dataset contents
+DATASET_VERSION = dataset_version([DATA_PATH, COORDINATES_PATH])
+map_cache = MapCache(os.environ.get('CRIME_MAP_CACHE_DIR', 'cache/maps'),
+                     int(os.environ.get('CRIME_MAP_CACHE_MAX_MB', 64)) * 1024 * 1024)
+
+# sklearn and the saved model are loaded on the first prediction. Set
+# CRIME_APP_WARMUP=1 to load them in a background thread instead, so new
+# workers serve pages immediately and predictions are warm shortly after.
+if os.environ.get('CRIME_APP_WARMUP') == '1':
+    start_background_warm_up()
 
 @app.route('/')
 def index():
@@ -55,6 +124,50 @@ def api_analysis():
             'avg_crimes': 0
         })
 
+@app.route('/api/compare')
+def api_compare():
+    """API endpoint comparing several states or districts side by side"""
+    try:
+        states = get_list_arg('states')
+        districts = get_list_arg('districts')
+        years = get_list_arg('years')
+        crime_types = get_list_arg('crime_types') or ['Total_Crimes']
+        top_n = int(request.args.get('top_n', 10))
+
+        comparison_data = perform_comparison(states, districts, years, crime_types, top_n)
+        return jsonify(comparison_data)
+    except Exception as e:
+        print(f"Error in api_compare: {e}")
+        return jsonify({'error': str(e)})
+
+def get_list_arg(name):
+    """List query parameter, given repeated (?a=1&a=2) or comma separated"""
+    values = []
+    for value in request.args.getlist(name):
+        values.extend(v.strip() for v in value.split(',') if v.strip())
+    return values
+
+@app.route('/api/distribution')
+def api_distribution():
+    """API endpoint for percentiles, histogram and district percentile rank"""
+    try:
+        crime_type = request.args.get('crime_type', 'Total_Crimes')
+        state = request.args.get('state', 'All')
+        year = request.args.get('year', 'All')
+        bins = request.args.get('bins', 10)
+        district = request.args.get('district')
+        district_state = request.args.get('district_state')
+        percentiles = get_list_arg('percentiles')
+        percentiles = [float(p) for p in percentiles] if percentiles else None
+
+        index = get_distribution_index(crime_type, state, year)
+        distribution_data = get_crime_distribution(index, crime_type, state, year,
+                                                   percentiles, bins, district, district_state)
+        return jsonify(distribution_data)
+    except Exception as e:
+        print(f"Error in api_distribution: {e}")
+        return jsonify({'error': str(e)})
+
 @app.route('/prediction')
 def prediction():
     return render_template('prediction.html', crime_types=CRIME_TYPES, states=STATES)
@@ -73,6 +186,58 @@ def predict():
     except Exception as e:
         return jsonify({'error': str(e)})
 
+@app.route('/api/model/stats')
+def api_model_stats():
+    """API endpoint reporting loaded models and coalesced computations"""
+    return jsonify(get_model_stats())
+
+@app.route('/api/forecast')
+def api_forecast():
+    """API endpoint for trend forecasts with prediction intervals"""
+    try:
+        state = request.args.get('state')
+        district = request.args.get('district')
+        if not state or not district:
+            return jsonify({'error': 'State and district required'})
+
+        crime_type = request.args.get('crime_type', 'Total_Crimes')
+        horizon = request.args.get('horizon', 1)
+        method = request.args.get('method', 'linear')
+        level = request.args.get('level', 0.95)
+
+        forecast_result = get_crime_forecast(get_forecaster(state, district), state, district,
+                                             crime_type, horizon, method, level)
+        return jsonify(forecast_result)
+    except Exception as e:
+        print(f"Error in api_forecast: {e}")
+        return jsonify({'error': str(e)})
+
+@app.route('/api/anomalies')
+def api_anomalies():
+    """API endpoint listing rows flagged by the anomaly checks"""
+    try:
+        state = request.args.get('state', 'All')
+        check = request.args.get('check')
+        try:
+            limit = int(request.args.get('limit', 100))
+        except ValueError:
+            return jsonify({'error': 'Limit must be an integer'})
+        if limit < 0:
+            return jsonify({'error': 'Limit must not be negative'})
+
+        anomaly_flags = get_anomalies()
+        if anomaly_flags is None:
+            return jsonify({'error': 'Anomaly checks are off with SQLite storage; '
+                                     'set CRIME_SQLITE_ANOMALIES=1 to enable them'})
+
+        return jsonify({
+            'total_anomalies': int(anomaly_flags['is_anomaly'].sum()),
+            'anomalies': anomaly_records(anomaly_flags, state, check, limit)
+        })
+    except Exception as e:
+        print(f"Error in api_anomalies: {e}")
+        return jsonify({'error': str(e)})
+
 @app.route('/hotspots')
 def hotspots():
     return render_template('hotspots.html', 
@@ -85,8 +250,12 @@ def api_hotspots():
     try:
         state = request.args.get('state', 'All')
         crime_type = request.args.get('crime_type', 'Total_Crimes')
+        method = request.args.get('method', 'count')
         
-        hotspots_data = get_crime_hotspots(state, crime_type)
+        if method == 'gistar':
+            hotspots_data = get_spatial_hotspots().hotspots(crime_type, state)
+        else:
+            hotspots_data = get_crime_hotspots(state, crime_type)
         return jsonify(hotspots_data)
     except Exception as e:
         print(f"Error in api_hotspots: {e}")
@@ -105,6 +274,40 @@ def api_hotspots_coordinates():
         print(f"Error in api_hotspots_coordinates: {e}")
         return jsonify({})
 
+@app.route('/api/hotspots/map')
+def api_hotspots_map():
+    """Server-side rendered folium hotspot map, served from the map cache
+
+    format=json returns the cached marker data instead of the map page.
+    """
+    try:
+        state = request.args.get('state', 'All')
+        crime_type = request.args.get('crime_type', 'Total_Crimes')
+        output_format = request.args.get('format', 'html')
+
+        if state != 'All' and state not in STATES:
+            return jsonify({'error': f"Unknown state: {state}"})
+        if crime_type not in store.columns:
+            crime_type = 'Total_Crimes'
+        if output_format not in ('html', 'json'):
+            return jsonify({'error': f"Unknown format: {output_format}"})
+
+        key = map_cache.key(state=state, crime_type=crime_type, dataset_version=DATASET_VERSION)
+        content = map_cache.get(key, ext=output_format)
+        if content is None:
+            hotspots = get_crime_hotspots_with_coordinates(state, crime_type, districts_only=True)
+            markers = hotspot_markers(hotspots)
+            artifacts = {'json': json.dumps(markers), 'html': render_hotspot_map(markers)}
+            for ext, artifact in artifacts.items():
+                map_cache.put(key, artifact, ext=ext)
+            content = artifacts[output_format]
+
+        mimetype = 'application/json' if output_format == 'json' else 'text/html'
+        return Response(content, mimetype=mimetype)
+    except Exception as e:
+        print(f"Error in api_hotspots_map: {e}")
+        return jsonify({'error': str(e)})
+
 @app.route('/policies')
 def policies():
     return render_template('policies.html', 
@@ -118,7 +321,7 @@ def api_policies():
     crime_type = request.args.get('crime_type', 'Total_Crimes')
     year = request.args.get('year', '2014')
     
-    insights = get_crime_insights(state, district, crime_type, year)
+    insights = get_crime_insights(state, district, crime_type, year, store=store)
     return jsonify(insights)
 
 @app.route('/get_districts')
@@ -127,7 +330,7 @@ def get_districts():
     if not state:
         return jsonify([])
     
-    districts = sorted(df[df['States/UTs'] == state]['District'].unique())
+    districts = store.distinct('District', {'States/UTs': state})
     return jsonify(districts)
 
 @app.route('/get_coordinates')
@@ -147,20 +350,24 @@ def get_coordinates():
         'longitude': coordinates[1]
     })
 
+@app.route('/api/district_matches')
+def api_district_matches():
+    """API endpoint listing dataset districts without a confident coordinate match"""
+    return jsonify(district_match_report)
+
 def perform_analysis(state, crime_type, year):
     """Perform crime data analysis"""
     try:
         year = int(year)
-        
-        # Filter data based on state and year
-        if state == 'All':
-            filtered_data = df[df['Year'] == year]
-        else:
-            filtered_data = df[(df['States/UTs'] == state) & (df['Year'] == year)]
+        state_filter = None if state == 'All' else state
         
         # Handle case where crime_type column might not exist
-        if crime_type not in filtered_data.columns:
+        if crime_type not in store.columns:
             crime_type = 'Total_Crimes'
+        
+        # Filter data based on state and year
+        filtered_data = store.rows({'States/UTs': state_filter, 'Year': year},
+                                   ['States/UTs', 'District', crime_type])
 
         # For "All" states, we want state-level totals, not district-level
         if state == 'All':
@@ -176,11 +383,7 @@ def perform_analysis(state, crime_type, year):
             top_districts = top_districts_data.nlargest(10, crime_type)
         
         # Yearly trend
-        if state == 'All':
-            yearly_data = df.groupby('Year')[crime_type].sum()
-        else:
-            state_data = df[df['States/UTs'] == state]
-            yearly_data = state_data.groupby('Year')[crime_type].sum()
+        yearly_data = store.group_sum('Year', crime_type, {'States/UTs': state_filter})
         
         # Calculate statistics
         total_crimes = filtered_data[crime_type].sum()
@@ -202,19 +405,97 @@ def perform_analysis(state, crime_type, year):
         }
     
 
-def get_crime_hotspots(state, crime_type):
-    """Get crime hotspots for mapping"""
+def perform_comparison(states, districts, years, crime_types, top_n=10):
+    """Totals, averages, top districts and trends for several groups at once
+
+    Groups are the requested states, or the requested districts when any are
+    given. Every statistic comes from one aggregation of the matching rows
+    in the store, and each result list is aligned with 'labels' for
+    charting. Aggregate rows such as the per-state 'Total' are left out so
+    they are not counted twice.
+    """
+    crime_types = [c for c in dict.fromkeys(crime_types) if c in store.columns] or ['Total_Crimes']
+    years = sorted(int(y) for y in years) if years else sorted(int(y) for y in YEARS)
+
+    # One aggregation per (state, district, year) of the requested states or
+    # districts, pushed down to the store. The trends, and restricted to the
+    # requested years the totals, per-district averages and top districts,
+    # are all rolled up from it.
+    filters = {'States/UTs': states or None, 'District': districts or None}
+    by_district = store.aggregate(['States/UTs', 'District', 'Year'], crime_types, filters)
+    keys = by_district.index.to_frame(index=False)
+    is_district = district_rows(keys).to_numpy()
+    by_district, keys = by_district[is_district], keys[is_district]
+    if districts:
+        group = keys['District'] + ', ' + keys['States/UTs']
+    else:
+        group = keys['States/UTs']
+    by_district.index = pd.MultiIndex.from_arrays([group, keys['District'], keys['Year']],
+                                                  names=['Group', 'District', 'Year'])
+    if districts:
+        # Request order; a district name found in several states gets one
+        # label per state, in the order of the requested states
+        found = set(group)
+        state_order = states or sorted(keys['States/UTs'].unique())
+        labels = [f"{district}, {state}" for district in dict.fromkeys(districts)
+                  for state in state_order if f"{district}, {state}" in found]
+    else:
+        labels = states or sorted(keys['States/UTs'].unique())
+    grouped = by_district.groupby(level=['Group', 'Year']).sum()
+    in_years = by_district[by_district.index.get_level_values('Year').isin(years)]
+    period = in_years.groupby(level='Group').sum().reindex(labels).fillna(0)
+    top_candidates = in_years.groupby(level=['Group', 'District']).sum()
+    all_years = sorted(int(y) for y in grouped.index.get_level_values('Year').unique())
+
+    comparison = {
+        'labels': labels,
+        'years': years,
+        'crime_types': crime_types,
+        'totals': {},
+        'averages': {},
+        'top_districts': {},
+        'trends': {'years': all_years, 'values': {}}
+    }
+    for crime_type in crime_types:
+        totals = period[(crime_type, 'sum')]
+        counts = period[(crime_type, 'count')]
+        averages = (totals / counts.where(counts > 0)).fillna(0)
+        comparison['totals'][crime_type] = [int(v) for v in totals]
+        comparison['averages'][crime_type] = [round(float(v), 2) for v in averages]
+
+        trend = grouped[(crime_type, 'sum')].unstack('Year').reindex(index=labels, columns=all_years).fillna(0)
+        comparison['trends']['values'][crime_type] = {
+            label: [int(v) for v in row] for label, row in zip(labels, trend.to_numpy())
+        }
+
+        top = (top_candidates[(crime_type, 'sum')]
+               .sort_values(ascending=False).groupby(level='Group').head(top_n))
+        comparison['top_districts'][crime_type] = {label: [] for label in labels}
+        for (label, district), value in top.items():
+            comparison['top_districts'][crime_type][label].append(
+                {'District': district, crime_type: int(value)})
+
+    return comparison
+
+def get_crime_hotspots(state, crime_type, districts_only=False):
+    """Get crime hotspots for mapping
+
+    With districts_only, aggregate rows such as the per-state 'Total' are
+    dropped before ranking, so every slot holds a real district.
+    """
     try:
         print(f"Getting hotspots for state: {state}, crime_type: {crime_type}")
         
         # Handle case where crime_type column might not exist
-        if crime_type not in df.columns:
+        if crime_type not in store.columns:
             crime_type = 'Total_Crimes'
             print(f"Crime type not found, using: {crime_type}")
         
         if state == 'All':
             # Aggregate by state and district
-            grouped_data = df.groupby(['States/UTs', 'District'])[crime_type].sum().reset_index()
+            grouped_data = store.group_sum(['States/UTs', 'District'], crime_type).reset_index()
+            if districts_only:
+                grouped_data = grouped_data[district_rows(grouped_data)]
             
             # Create location keys and sort by crime count
             hotspots_dict = {}
@@ -233,12 +514,13 @@ def get_crime_hotspots(state, crime_type):
             return sorted_hotspots
         else:
             # Filter by state and aggregate by district
-            state_data = df[df['States/UTs'] == state]
-            if state_data.empty:
+            district_data = store.group_sum('District', crime_type, {'States/UTs': state})
+            if districts_only:
+                district_data = district_data[~district_data.index.map(is_aggregate_name)]
+            if district_data.empty:
                 print(f"No data found for state: {state}")
                 return {}
                 
-            district_data = state_data.groupby('District')[crime_type].sum()
             
             hotspots_dict = {}
             for district, crime_count in district_data.items():
@@ -257,10 +539,10 @@ def get_crime_hotspots(state, crime_type):
         print(f"Error in get_crime_hotspots: {e}")
         return {}
 
-def get_crime_hotspots_with_coordinates(state, crime_type):
+def get_crime_hotspots_with_coordinates(state, crime_type, districts_only=False):
     """Get crime hotspots with coordinates"""
     try:
-        hotspots = get_crime_hotspots(state, crime_type)
+        hotspots = get_crime_hotspots(state, crime_type, districts_only)
         hotspots_with_coords = {}
         
         for location, crime_count in hotspots.items():
@@ -280,24 +562,57 @@ def get_crime_hotspots_with_coordinates(state, crime_type):
         print(f"Error in get_crime_hotspots_with_coordinates: {e}")
         return {}
 
-# Load district coordinates
-def load_district_coordinates():
-    try:
-        coords_df = pd.read_csv('data/district_coordinates.csv')
-        coordinates = {}
-        for _, row in coords_df.iterrows():
-            coordinates[f"{row['State']},{row['District']}"] = [row['Latitude'], row['Longitude']]
-        return coordinates
-    except Exception as e:
-        print(f"Error loading coordinates: {e}")
-        return {}
-
-# Load coordinates at startup
-district_coordinates = load_district_coordinates()
+# Build the fuzzy district name index and resolve every dataset district
+district_matcher = DistrictMatcher(district_coords_df)
+district_match_report = district_matcher.match_all(
+    (state, district) for state, district in store.distinct(['States/UTs', 'District'])
+    if not is_aggregate_name(district))
+print(f"District coordinates: {district_match_report['matched']} matched, "
+      f"{len(district_match_report['low_confidence'])} low confidence, "
+      f"{len(district_match_report['unmatched'])} unmatched")
 
 def get_coordinates_for_district(state, district):
-    key = f"{state},{district}"
-    return district_coordinates.get(key, [20.5937, 78.9629])  # Default to India center
+    return district_matcher.get_coordinates(state, district)  # Defaults to India center
+
+# Spatial hotspot statistics, built on first use since they need scipy
+spatial_hotspots = None
+
+def get_spatial_hotspots():
+    """Gi* and local Moran's I for all crime columns over matched districts"""
+    def load():
+        global spatial_hotspots
+        if spatial_hotspots is None:
+            spatial_hotspots = build_spatial_hotspots()
+        return spatial_hotspots
+
+    if spatial_hotspots is None:
+        return index_flight.do('spatial_hotspots', load)
+    return spatial_hotspots
+
+def build_spatial_hotspots():
+    """Build the neighbor graph and compute statistics; rerun on dataset updates
+
+    Per-district sums are read from the store. Aggregate rows and
+    non-territorial units (railway police, CID, crime branches and the
+    like) are left out: they have no area of their own and would otherwise
+    be stacked on their headquarters district.
+    """
+    crime_columns = [c for c in CRIME_COLUMNS if c in store.columns]
+    values = store.group_sum(['States/UTs', 'District'], crime_columns)
+    districts = values.index.get_level_values('District')
+    values = values[~(districts.map(is_aggregate_name) | districts.map(is_non_territorial))]
+
+    locations = []
+    for state, district in values.index:
+        match = district_matcher.match(state, district)
+        if match['status'] == 'matched':
+            lat, lon = match['coordinates']
+            locations.append({'state': state, 'district': district,
+                              'latitude': lat, 'longitude': lon})
+
+    spatial = SpatialHotspots(pd.DataFrame(locations))
+    spatial.compute(values)
+    return spatial
 
 if __name__ == '__main__':
     # Train model on startup
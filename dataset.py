@@ -0,0 +1,49 @@
+# Column names and row rules of the crime dataset, shared by all modules.
+# Kept free of pandas and numpy imports so light clients such as
+# load_test.py can use it.
+
+import re
+
+DATA_PATH = 'data/crime_data.csv'
+COORDINATES_PATH = 'data/district_coordinates.csv'
+MODEL_PATH = 'models/crime_model.pkl'
+
+# Crime types from dataset
+CRIME_TYPES = ['Murder', 'Rape', 'Kidnapping', 'Dacoity', 'Burglary', 'Theft',
+               'Riots', 'Forgery', 'Counterfeiting', 'Arson', 'Acid attack',
+               'Dowry Deaths', 'Stalking']
+
+TOTAL_COLUMN = 'Total_Crimes'
+
+# Every numeric crime column, including the per-row total
+CRIME_COLUMNS = CRIME_TYPES + [TOTAL_COLUMN]
+
+# District names of aggregate rows. Each state has a 'Total' row that sums
+# its districts; these are not districts and must not be counted twice.
+AGGREGATE_DISTRICTS = {'total', 'all', 'overall'}
+
+
+def is_aggregate_name(name):
+    """True for district (or state) names that denote an aggregate row"""
+    return str(name).strip().lower() in AGGREGATE_DISTRICTS
+
+
+def district_rows(df):
+    """Boolean mask of the rows of df that are real districts"""
+    return ~df['District'].astype(str).str.strip().str.lower().isin(AGGREGATE_DISTRICTS)
+
+
+# Police units listed as districts that have no territory of their own:
+# railway police, CID and crime branches, special cells and squads. The
+# coordinate lookup places them on their headquarters city, where they
+# would stack on top of the real district.
+NON_TERRITORIAL_PATTERN = re.compile(
+    r"\b(?:railways?|rly|g\.?\s*r\.?\s*p|c\.?\s*i\.?\s*d|crime|anti terrorist|"
+    r"economic offences|eow|cyber cell|spl|special|stf|vigilance|airport|metro|"
+    r"other units)\b",
+    re.IGNORECASE)
+
+
+def is_non_territorial(name):
+    """True for district names that denote a non-territorial police unit"""
+    return NON_TERRITORIAL_PATTERN.search(str(name)) is not None
@@ -0,0 +1,142 @@
+from collections import defaultdict
+
+import numpy as np
+from dataset import CRIME_COLUMNS, district_rows
+
+DEFAULT_PERCENTILES = [10, 25, 50, 75, 90, 95, 99]
+
+MAX_BINS = 100
+
+
+class DistributionIndex:
+    """Presorted per-district values for every (state, year) scope.
+
+    For each scope ('All' or a state, 'All' or a year) the district values
+    of every crime column are sorted once at load time. Quantiles are then
+    read by index, and ranks and histogram counts found by binary search.
+    With year 'All' a district's value is its sum over all years. Aggregate
+    rows such as the per-state 'Total' are left out.
+    """
+
+    def __init__(self, df, crime_columns=None):
+        self.crime_columns = [c for c in (crime_columns or CRIME_COLUMNS) if c in df.columns]
+        data = df[district_rows(df)]
+        by_district = data.groupby(['States/UTs', 'District'])[self.crime_columns].sum().reset_index()
+
+        # scope -> (column-wise sorted values, {district: [(state, values)]})
+        self.scopes = {}
+        self._add_scopes(data, year_key=lambda year: int(year))
+        self._add_scopes(by_district, year_key=None)
+
+    def _add_scopes(self, data, year_key):
+        values = data[self.crime_columns].to_numpy(dtype=float)
+        states = data['States/UTs'].to_numpy()
+        districts = data['District'].to_numpy()
+
+        groups = {}
+        if year_key is None:
+            groups[('All', 'All')] = np.arange(len(data))
+            for state, idx in data.groupby('States/UTs').indices.items():
+                groups[(state, 'All')] = idx
+        else:
+            for year, idx in data.groupby('Year').indices.items():
+                groups[('All', year_key(year))] = idx
+            for (state, year), idx in data.groupby(['States/UTs', 'Year']).indices.items():
+                groups[(state, year_key(year))] = idx
+
+        for scope, idx in groups.items():
+            scope_values = values[idx]
+            lookup = defaultdict(list)
+            for i in idx:
+                lookup[districts[i]].append((states[i], values[i]))
+            self.scopes[scope] = (np.sort(scope_values, axis=0), lookup)
+
+    def distribution(self, crime_type, state='All', year='All', percentiles=None,
+                     bins=10, district=None, district_state=None):
+        """Percentiles, histogram and optional district rank for one scope
+
+        District names repeat across states (e.g. 'Crime Branch'), so with
+        state 'All' an ambiguous district needs district_state.
+        """
+        if crime_type not in self.crime_columns:
+            raise KeyError(f"Unknown crime type: {crime_type}")
+        year = year if year == 'All' else int(year)
+        scope = self.scopes.get((state, year))
+        if scope is None:
+            raise KeyError(f"No data for state {state}, year {year}")
+        if not 1 <= bins <= MAX_BINS:
+            raise ValueError(f"Bins must be between 1 and {MAX_BINS}")
+        percentiles = DEFAULT_PERCENTILES if percentiles is None else percentiles
+        if any(not 0 <= p <= 100 for p in percentiles):
+            raise ValueError("Percentiles must be between 0 and 100")
+
+        sorted_values, lookup = scope
+        c = self.crime_columns.index(crime_type)
+        column = sorted_values[:, c]
+        n = len(column)
+
+        # Quantiles by index into the sorted column (linear interpolation)
+        positions = np.asarray(percentiles, dtype=float) / 100 * (n - 1)
+        lower = np.floor(positions).astype(int)
+        upper = np.minimum(lower + 1, n - 1)
+        weight = positions - lower
+        quantiles = column[lower] * (1 - weight) + column[upper] * weight
+
+        # Histogram counts from the positions of the bin edges
+        edges = np.linspace(column[0], column[-1], bins + 1)
+        if column[0] == column[-1]:
+            edges = column[0] + np.arange(bins + 1, dtype=float)
+        cuts = np.searchsorted(column, edges[1:-1], side='left')
+        counts = np.diff(np.concatenate([[0], cuts, [n]]))
+
+        result = {
+            'crime_type': crime_type,
+            'state': state,
+            'year': year,
+            'count': int(n),
+            'min': float(column[0]),
+            'max': float(column[-1]),
+            'mean': round(float(column.mean()), 2),
+            'percentiles': {f"p{p:g}": round(float(q), 2) for p, q in zip(percentiles, quantiles)},
+            'histogram': {
+                'edges': [round(float(e), 2) for e in edges],
+                'counts': [int(x) for x in counts]
+            }
+        }
+
+        if district:
+            matches = lookup.get(district, [])
+            if district_state:
+                matches = [match for match in matches if match[0] == district_state]
+            if not matches:
+                result['district_rank'] = {'district': district, 'error': 'District not in scope'}
+            elif len(matches) > 1:
+                result['district_rank'] = {
+                    'district': district,
+                    'error': 'District name is in several states; give district_state',
+                    'states': [match[0] for match in matches]
+                }
+            else:
+                district_state, row = matches[0]
+                value = row[c]
+                below = np.searchsorted(column, value, side='left')
+                at_or_below = np.searchsorted(column, value, side='right')
+                result['district_rank'] = {
+                    'district': district,
+                    'state': district_state,
+                    'value': float(value),
+                    # Midpoint rank, so ties share the same percentile
+                    'percentile_rank': round(float((below + at_or_below) / 2 / n * 100), 2)
+                }
+
+        return result
+
+
+def get_crime_distribution(index, crime_type='Total_Crimes', state='All', year='All',
+                           percentiles=None, bins=10, district=None, district_state=None):
+    """Distribution statistics, returning an error payload on bad input"""
+    try:
+        return index.distribution(crime_type, state, year, percentiles, int(bins), district,
+                                  district_state)
+    except (KeyError, ValueError) as e:
+        return {'error': e.args[0] if e.args else str(e)}
@@ -0,0 +1,152 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+# Center of India, used when a district cannot be matched
+DEFAULT_COORDINATES = [20.5937, 78.9629]
+
+NGRAM_SIZE = 3
+
+# Lookups come from request parameters, so the result cache is bounded
+MAX_CACHE_SIZE = 10000
+
+
+def normalize_name(name):
+    """Normalize a state or district name for matching"""
+    name = unicodedata.normalize('NFKD', str(name))
+    name = name.encode('ascii', 'ignore').decode('ascii').lower()
+    name = name.replace('&', ' and ')
+    name = re.sub(r'[^a-z0-9]+', ' ', name)
+    return ' '.join(name.split())
+
+
+def char_ngrams(name, n=NGRAM_SIZE):
+    """Set of character n-grams of a normalized name, padded at word edges"""
+    padded = f" {name} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+class DistrictMatcher:
+    """Fuzzy (state, district) to coordinate index.
+
+    Names are normalized and split into character trigrams once, when the
+    index is built. A lookup first tries the normalized name exactly, then
+    scores candidates that share a trigram with the query using the Dice
+    coefficient. Resolved lookups are cached, so repeated requests are a
+    single dict access.
+    """
+
+    def __init__(self, coords_df, min_score=0.5, confident_score=0.8):
+        self.min_score = min_score
+        self.confident_score = confident_score
+        self.names = []
+        self.coordinates = []
+        self.ngram_counts = []
+        self.exact = {}
+        self.states = {}
+        # (state, ngram) -> candidate ids, plus ngram -> ids across all states
+        self.state_ngram_index = defaultdict(list)
+        self.ngram_index = defaultdict(list)
+        self._cache = {}
+
+        for state, district, lat, lon in coords_df[['State', 'District', 'Latitude', 'Longitude']].itertuples(index=False):
+            state_key = normalize_name(state)
+            district_key = normalize_name(district)
+            if (state_key, district_key) in self.exact:
+                continue
+
+            idx = len(self.names)
+            self.names.append((state, district))
+            self.coordinates.append([float(lat), float(lon)])
+            self.exact[(state_key, district_key)] = idx
+            self.states.setdefault(state_key, state)
+
+            ngrams = char_ngrams(district_key)
+            self.ngram_counts.append(len(ngrams))
+            for gram in ngrams:
+                self.state_ngram_index[(state_key, gram)].append(idx)
+                self.ngram_index[gram].append(idx)
+
+    def _best_candidate(self, state_key, district_key):
+        """Highest scoring indexed district for a normalized query"""
+        ngrams = char_ngrams(district_key)
+        if state_key in self.states:
+            postings = [self.state_ngram_index.get((state_key, gram), ()) for gram in ngrams]
+        else:
+            postings = [self.ngram_index.get(gram, ()) for gram in ngrams]
+
+        shared = defaultdict(int)
+        for ids in postings:
+            for idx in ids:
+                shared[idx] += 1
+
+        best_idx, best_score = None, 0.0
+        for idx, count in shared.items():
+            score = 2 * count / (len(ngrams) + self.ngram_counts[idx])
+            if score > best_score:
+                best_idx, best_score = idx, score
+        return best_idx, best_score
+
+    def match(self, state, district):
+        """Match a district name, returning a dict with coordinates and score"""
+        cache_key = (state, district)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        state_key = normalize_name(state)
+        district_key = normalize_name(district)
+
+        idx = self.exact.get((state_key, district_key))
+        score = 1.0
+        if idx is None:
+            idx, score = self._best_candidate(state_key, district_key)
+
+        if idx is None or score < self.min_score:
+            result = {
+                'state': state,
+                'district': district,
+                'matched_state': None,
+                'matched_district': None,
+                'coordinates': DEFAULT_COORDINATES,
+                'score': round(score, 3),
+                'status': 'unmatched'
+            }
+        else:
+            matched_state, matched_district = self.names[idx]
+            result = {
+                'state': state,
+                'district': district,
+                'matched_state': matched_state,
+                'matched_district': matched_district,
+                'coordinates': self.coordinates[idx],
+                'score': round(score, 3),
+                'status': 'matched' if score >= self.confident_score else 'low_confidence'
+            }
+
+        if len(self._cache) >= MAX_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[cache_key] = result
+        return result
+
+    def get_coordinates(self, state, district):
+        """Coordinates for a confidently matched district, else the center of India
+
+        Low-confidence matches can be a different district hundreds of
+        kilometres away, so they are not used as coordinates.
+        """
+        result = self.match(state, district)
+        if result['status'] != 'matched':
+            return DEFAULT_COORDINATES
+        return result['coordinates']
+
+    def match_all(self, pairs):
+        """Resolve many (state, district) pairs and summarize the results"""
+        report = {'matched': 0, 'low_confidence': [], 'unmatched': []}
+        for state, district in pairs:
+            result = self.match(state, district)
+            if result['status'] == 'matched':
+                report['matched'] += 1
+            else:
+                report[result['status']].append(result)
+        return report
@@ -0,0 +1,200 @@
+import pandas as pd
+import numpy as np
+from dataset import CRIME_COLUMNS
+
+# Two-sided normal quantiles for the supported interval levels
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+MAX_HORIZON = 10
+
+
+class CrimeForecaster:
+    """Trend forecaster fitted on every district and crime type at once.
+
+    The data is held as a (series, crime type, year) cube so that the linear
+    trend and exponential smoothing fits are plain numpy reductions over the
+    last axis instead of one model per district.
+    """
+
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self.keys = []
+        self.key_index = {}
+        self.crime_types = []
+        self.years = np.array([], dtype=float)
+        self.values = None
+        self.mask = None
+        self.params = {}
+
+    def fit(self, df, crime_types=None, years=None):
+        """Build the series cube from the dataset and fit all models
+
+        `years` is the full list of dataset years, for fitting only some
+        districts' rows; by default it is taken from df.
+        """
+        crime_types = [c for c in (crime_types or CRIME_COLUMNS) if c in df.columns]
+
+        grouped = df.groupby(['States/UTs', 'District', 'Year'])[crime_types].sum(min_count=1)
+        years = sorted(years if years is not None else df['Year'].unique())
+        cube = grouped.unstack('Year').reindex(
+            columns=pd.MultiIndex.from_product([crime_types, years]))
+
+        self.keys = [(state, district) for state, district in cube.index]
+        self.key_index = {key: i for i, key in enumerate(self.keys)}
+        self.crime_types = crime_types
+        self.years = np.array(years, dtype=float)
+
+        values = cube.to_numpy(dtype=float).reshape(len(self.keys), len(crime_types), len(self.years))
+        self.mask = ~np.isnan(values)
+        self.values = np.where(self.mask, values, 0.0)
+
+        self.params = {
+            'linear': self._fit_linear(),
+            'exponential': self._fit_exponential(),
+        }
+        return self
+
+    def _fit_linear(self):
+        """Weighted least squares trend for every series in one pass"""
+        w = self.mask.astype(float)
+        t = self.years - (self.years.mean() if len(self.years) else 0.0)
+        y = self.values
+
+        n = w.sum(axis=-1)
+        st = (w * t).sum(axis=-1)
+        sy = (w * y).sum(axis=-1)
+        stt = (w * t * t).sum(axis=-1)
+        sty = (w * t * y).sum(axis=-1)
+
+        safe_n = np.maximum(n, 1)
+        t_mean = st / safe_n
+        sxx = stt - st * t_mean
+        has_trend = sxx > 1e-9
+        slope = np.where(has_trend, (sty - t_mean * sy) / np.where(has_trend, sxx, 1.0), 0.0)
+        intercept = sy / safe_n - slope * t_mean
+
+        fitted = intercept[..., None] + slope[..., None] * t
+        sse = (w * (y - fitted) ** 2).sum(axis=-1)
+        sigma = np.sqrt(sse / np.maximum(n - 2, 1))
+        # Too few points for a residual estimate: fall back to Poisson noise
+        # around the fitted level, which suits count data.
+        sigma = np.where(n > 2, sigma, np.sqrt(np.maximum(intercept + slope * t_mean, 0)))
+
+        return {
+            'intercept': intercept,
+            'slope': slope,
+            'sigma': sigma,
+            'n': n,
+            't_mean': t_mean,
+            'sxx': sxx,
+            't_offset': self.years.mean() if len(self.years) else 0.0,
+        }
+
+    def _fit_exponential(self):
+        """Simple exponential smoothing, iterating over years for all series"""
+        alpha = self.alpha
+        shape = self.values.shape[:-1]
+        level = np.zeros(shape)
+        started = np.zeros(shape, dtype=bool)
+        sse = np.zeros(shape)
+        n_err = np.zeros(shape)
+
+        for i in range(self.values.shape[-1]):
+            observed = self.mask[..., i]
+            y = self.values[..., i]
+
+            err = y - level
+            scored = observed & started
+            sse += np.where(scored, err ** 2, 0.0)
+            n_err += scored
+
+            level = np.where(observed & started, level + alpha * err, level)
+            level = np.where(observed & ~started, y, level)
+            started |= observed
+
+        sigma = np.sqrt(sse / np.maximum(n_err, 1))
+        sigma = np.where(n_err > 1, sigma, np.sqrt(np.maximum(level, 0)))
+
+        return {'level': level, 'sigma': sigma, 'n': self.mask.sum(axis=-1)}
+
+    def forecast_all(self, horizon=1, method='linear', level=0.95, index=Ellipsis):
+        """Forecast series for years 1..horizon past the last observed year
+
+        Returns (years, mean, lower, upper) with arrays shaped
+        (series, crime type, horizon). `index` selects from the fitted
+        parameters first, e.g. (series, crime type) for a single series,
+        so only the requested forecasts are computed.
+        """
+        if method not in self.params:
+            raise ValueError(f"Unknown forecast method: {method}")
+        if not 1 <= horizon <= MAX_HORIZON:
+            raise ValueError(f"Horizon must be between 1 and {MAX_HORIZON}")
+        z = Z_SCORES.get(float(level))
+        if z is None:
+            raise ValueError(f"Unsupported interval level: {level}")
+
+        last_year = self.years[-1] if len(self.years) else 0.0
+        steps = np.arange(1, horizon + 1, dtype=float)
+        future_years = last_year + steps
+        p = {name: value[index] if isinstance(value, np.ndarray) else value
+             for name, value in self.params[method].items()}
+
+        if method == 'linear':
+            t = future_years - p['t_offset']
+            mean = p['intercept'][..., None] + p['slope'][..., None] * t
+            n = np.maximum(p['n'], 1)[..., None]
+            sxx = np.where(p['sxx'] > 1e-9, p['sxx'], np.inf)[..., None]
+            spread = np.sqrt(1 + 1 / n + (t - p['t_mean'][..., None]) ** 2 / sxx)
+        else:
+            mean = np.repeat(p['level'][..., None], horizon, axis=-1)
+            spread = np.sqrt(1 + (steps - 1) * self.alpha ** 2)
+
+        half_width = z * p['sigma'][..., None] * spread
+        mean = np.maximum(mean, 0)
+        lower = np.maximum(mean - half_width, 0)
+        upper = mean + half_width
+
+        return future_years.astype(int), mean, lower, upper
+
+    def forecast(self, state, district, crime_type='Total_Crimes', horizon=1,
+                 method='linear', level=0.95):
+        """Forecast a single district and crime type"""
+        idx = self.key_index.get((state, district))
+        if idx is None:
+            raise KeyError(f"Unknown district: {state}, {district}")
+        if crime_type not in self.crime_types:
+            raise KeyError(f"Unknown crime type: {crime_type}")
+        c = self.crime_types.index(crime_type)
+
+        years, mean, lower, upper = self.forecast_all(horizon, method, level, index=(idx, c))
+        history_years = int(self.mask[idx, c].sum())
+
+        return {
+            'state': state,
+            'district': district,
+            'crime_type': crime_type,
+            'method': method,
+            'interval_level': level,
+            'history_years': history_years,
+            # With fewer than two years there is no trend, the forecast is
+            # the last level and the interval uses the Poisson fallback
+            'trend_available': history_years >= 2,
+            'forecast': [
+                {
+                    'year': int(year),
+                    'predicted_crimes': round(float(mean[h]), 2),
+                    'lower': round(float(lower[h]), 2),
+                    'upper': round(float(upper[h]), 2),
+                }
+                for h, year in enumerate(years)
+            ]
+        }
+
+
+def get_crime_forecast(forecaster, state, district, crime_type='Total_Crimes',
+                       horizon=1, method='linear', level=0.95):
+    """Forecast crimes for a district, returning an error payload on bad input"""
+    try:
+        return forecaster.forecast(state, district, crime_type, int(horizon), method, float(level))
+    except (KeyError, ValueError) as e:
+        return {'error': e.args[0] if e.args else str(e)}
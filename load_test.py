@@ -0,0 +1,292 @@
+import argparse
+import csv
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from dataset import CRIME_COLUMNS, DATA_PATH, MODEL_PATH, is_aggregate_name
+
+# Relative weights of the dashboard requests, as issued by the pages in
+# templates/ and static/js/
+DEFAULT_MIX = {
+    'analysis': 30,
+    'hotspots': 20,
+    'policies': 15,
+    'districts': 25,
+    'predict': 10,
+}
+
+
+def load_districts(path=DATA_PATH):
+    """State -> district names, read without pandas to keep the client light"""
+    districts = defaultdict(list)
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if not is_aggregate_name(row['District']):
+                districts[row['States/UTs']].append(row['District'])
+    return dict(districts)
+
+
+def build_request(route, districts, rng):
+    """(method, path, body) for one request of the given route"""
+    state = rng.choice(list(districts))
+    district = rng.choice(districts[state])
+    crime_type = rng.choice(CRIME_COLUMNS)
+
+    if route == 'analysis':
+        params = {'state': rng.choice([state, 'All']), 'crime_type': crime_type, 'year': 2014}
+        return 'GET', '/api/analysis?' + urllib.parse.urlencode(params), None
+    if route == 'hotspots':
+        params = {'state': rng.choice([state, 'All']), 'crime_type': crime_type}
+        return 'GET', '/api/hotspots/coordinates?' + urllib.parse.urlencode(params), None
+    if route == 'policies':
+        params = {'state': state, 'district': rng.choice([district, 'All']),
+                  'crime_type': crime_type, 'year': 2014}
+        return 'GET', '/api/policies?' + urllib.parse.urlencode(params), None
+    if route == 'districts':
+        return 'GET', '/get_districts?' + urllib.parse.urlencode({'state': state}), None
+    if route == 'predict':
+        body = {'state': state, 'district': district, 'crime_type': crime_type, 'year': 2015}
+        return 'POST', '/predict', json.dumps(body).encode('utf-8')
+    raise ValueError(f"Unknown route: {route}")
+
+
+def has_error(payload):
+    """True if a response body is a JSON object with an 'error' key.
+
+    The app reports most failures as {'error': ...} with status 200.
+    """
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        return False
+    return isinstance(data, dict) and 'error' in data
+
+
+def send(base_url, method, path, body, timeout):
+    """Send one request; returns (latency seconds, ok)"""
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    req = urllib.request.Request(base_url + path, data=body, method=method, headers=headers)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            payload = response.read()
+            ok = response.status < 400 and not has_error(payload)
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def process_tree(pid):
+    """pid and all of its descendants, from /proc (Linux only)"""
+    children = defaultdict(list)
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name can contain spaces, so split after it
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children[ppid].append(int(entry))
+
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(children.get(current, []))
+    return pids
+
+
+def rss_kb(pid):
+    """Resident set size of a process in kB, or None if unavailable"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def memory_snapshot(pid):
+    if pid is None or not os.path.isdir('/proc'):
+        return {}
+    return {p: rss_kb(p) for p in process_tree(pid) if rss_kb(p) is not None}
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def start_server(command, base_url, timeout=60):
+    """Start the app and wait until it answers the home page"""
+    try:
+        with urllib.request.urlopen(base_url + '/', timeout=2):
+            raise SystemExit(f"Something is already serving {base_url}; use --url or --port")
+    except (urllib.error.URLError, OSError):
+        pass
+
+    # Own process group, so the shell and every worker it starts can be
+    # stopped together
+    server = subprocess.Popen(command, shell=True, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"Server exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + '/', timeout=2):
+                return server
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.25)
+    stop_server(server)
+    raise SystemExit("Server did not start in time")
+
+
+def stop_server(server):
+    """Terminate the server's whole process group"""
+    try:
+        os.killpg(server.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    server.wait()
+
+
+def run_load_test(base_url, mix, concurrency, duration, timeout, seed, server_pid=None):
+    """Replay the request mix at fixed concurrency and collect per-route results"""
+    districts = load_districts()
+    routes = list(mix)
+    weights = [mix[r] for r in routes]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            route = rng.choices(routes, weights)[0]
+            method, path, body = build_request(route, districts, rng)
+            latency, ok = send(base_url, method, path, body, timeout)
+            with lock:
+                latencies[route].append(latency)
+                if not ok:
+                    errors[route] += 1
+
+    memory_before = memory_snapshot(server_pid)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    memory_after = memory_snapshot(server_pid)
+
+    return latencies, errors, elapsed, memory_before, memory_after
+
+
+def print_report(latencies, errors, elapsed, memory_before, memory_after):
+    print(f"{'route':<12}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'errors':>9}")
+    all_latencies = []
+    for route in sorted(latencies):
+        values = sorted(latencies[route])
+        all_latencies.extend(values)
+        print(f"{route:<12}{len(values):>10}{len(values) / elapsed:>10.1f}"
+              f"{percentile(values, 50) * 1000:>10.1f}{percentile(values, 95) * 1000:>10.1f}"
+              f"{percentile(values, 99) * 1000:>10.1f}{errors[route] / len(values):>9.1%}")
+
+    all_latencies.sort()
+    total_errors = sum(errors.values())
+    if all_latencies:
+        print(f"{'all':<12}{len(all_latencies):>10}{len(all_latencies) / elapsed:>10.1f}"
+              f"{percentile(all_latencies, 50) * 1000:>10.1f}"
+              f"{percentile(all_latencies, 95) * 1000:>10.1f}"
+              f"{percentile(all_latencies, 99) * 1000:>10.1f}"
+              f"{total_errors / len(all_latencies):>9.1%}")
+
+    print()
+    if not memory_before:
+        print("Worker memory: unavailable (needs a locally started server on Linux)")
+        return
+    print(f"{'pid':<10}{'rss before MB':>15}{'rss after MB':>15}{'growth MB':>12}")
+    for pid in sorted(set(memory_before) | set(memory_after)):
+        before = memory_before.get(pid)
+        after = memory_after.get(pid)
+        growth = f"{(after - before) / 1024:>12.1f}" if before and after else f"{'-':>12}"
+        print(f"{pid:<10}"
+              f"{before / 1024 if before else 0:>15.1f}"
+              f"{after / 1024 if after else 0:>15.1f}{growth}")
+
+
+def parse_mix(value):
+    """Parse 'analysis=30,predict=10' into a weight dict"""
+    mix = {}
+    for part in value.split(','):
+        route, weight = part.split('=')
+        if route.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown route: {route}")
+        mix[route.strip()] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay dashboard traffic against the app')
+    parser.add_argument('--url', help='Test an already running server instead of starting one')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--server-cmd',
+                        help='Command that starts the server on --port '
+                             '(default: Flask threaded server)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='Route weights, e.g. analysis=30,districts=25,predict=10')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Without a saved model /predict answers with a fixed fallback value,
+    # so the run would not measure real predictions
+    if args.mix.get('predict') and not os.path.exists(MODEL_PATH):
+        message = (f"{MODEL_PATH} not found, so /predict only returns its fallback; "
+                   f"run train_model.py first or leave predict out of --mix")
+        if not args.url:
+            raise SystemExit(message)
+        print(f"Warning: {message}")
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        base_url = f"http://127.0.0.1:{args.port}"
+        command = args.server_cmd or (
+            f'"{sys.executable}" -c "from app import app; '
+            f'app.run(port={args.port}, threaded=True)"')
+        server = start_server(command, base_url)
+
+    try:
+        print(f"Load test: {base_url}, concurrency {args.concurrency}, {args.duration:.0f}s")
+        results = run_load_test(base_url, args.mix, args.concurrency, args.duration,
+                                args.timeout, args.seed, server.pid if server else None)
+        print_report(*results)
+    finally:
+        if server is not None:
+            stop_server(server)
+
+
+if __name__ == '__main__':
+    main()
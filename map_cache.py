@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataset import is_aggregate_name
+
+# Bump when the rendered map output changes so old cache entries are ignored
+RENDERER_VERSION = 2
+
+# Same marker scale as the client-side map in hotspots.html
+RADIUS_SCALE = [(10000, 25), (5000, 20), (2000, 16), (1000, 12), (500, 10), (100, 8), (50, 6)]
+COLOR_SCALE = [(10000, '#8B0000'), (5000, '#FF0000'), (2000, '#FF4500'), (1000, '#FF8C00'),
+               (500, '#FFA500'), (100, '#FFD700'), (50, '#FFFF00')]
+
+
+def dataset_version(paths):
+    """Content hash of the data files the maps are rendered from"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class MapCache:
+    """Content-addressed on-disk cache of rendered map artifacts.
+
+    Entries are keyed by a hash of the filters and dataset version and are
+    stored as <cache_dir>/<key[:2]>/<key>.<ext>. Once the total size passes
+    max_bytes, the least recently used files are deleted.
+    """
+
+    def __init__(self, cache_dir='cache/maps', max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, **filters):
+        """Cache key for a set of filter values"""
+        filters['renderer_version'] = RENDERER_VERSION
+        payload = json.dumps(filters, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{ext}")
+
+    def get(self, key, ext='html'):
+        """Cached content for a key, or None"""
+        path = self._path(key, ext)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        # Mark as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return content
+
+    def put(self, key, content, ext='html'):
+        """Store content atomically and evict old entries if over the size limit"""
+        path = self._path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A unique temp file per write, so concurrent misses for the same
+        # key in one process do not clobber each other
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def _scale(value, scale, default):
+    for threshold, result in scale:
+        if value > threshold:
+            return result
+    return default
+
+
+def hotspot_markers(hotspots):
+    """Marker data for hotspots, skipping aggregate rows such as 'Total'"""
+    markers = []
+    for data in hotspots.values():
+        if is_aggregate_name(data['district']) or is_aggregate_name(data['state']):
+            continue
+        markers.append({
+            'state': data['state'],
+            'district': data['district'],
+            'crime_count': data['crime_count'],
+            'latitude': data['latitude'],
+            'longitude': data['longitude'],
+            'radius': _scale(data['crime_count'], RADIUS_SCALE, 4),
+            'color': _scale(data['crime_count'], COLOR_SCALE, '#90EE90')
+        })
+    return markers
+
+
+def render_hotspot_map(markers):
+    """Render hotspot markers to a standalone folium map page"""
+    import folium
+
+    hotspot_map = folium.Map(location=[20.5937, 78.9629], zoom_start=5)
+    for marker in markers:
+        folium.CircleMarker(
+            location=[marker['latitude'], marker['longitude']],
+            radius=marker['radius'],
+            color='#000',
+            weight=1,
+            fill=True,
+            fill_color=marker['color'],
+            fill_opacity=0.7,
+            popup=f"{marker['district']}, {marker['state']}: {marker['crime_count']}"
+        ).add_to(hotspot_map)
+
+    if markers:
+        lats = [m['latitude'] for m in markers]
+        lons = [m['longitude'] for m in markers]
+        hotspot_map.fit_bounds([[min(lats), min(lons)], [max(lats), max(lons)]])
+
+    return hotspot_map.get_root().render()
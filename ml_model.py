@@ -1,21 +1,89 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import mean_absolute_error, r2_score
-import joblib
+import threading
 import warnings
+from anomalies import detect_anomalies
+from dataset import MODEL_PATH
 warnings.filterwarnings('ignore')
 
-class CrimePredictor:
+# sklearn and joblib take most of this module's import time and are only
+# needed for training and prediction, so they are imported where used.
+
+_predictor = None
+
+# Guards the models and encoders of every CrimePredictor. A module-level
+# lock keeps predictors picklable.
+_model_lock = threading.Lock()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one computation.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and share its result or exception.
+    """
+
     def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {'done': threading.Event(), 'result': None, 'error': None}
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call['result'] = fn()
+            except Exception as e:
+                call['error'] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                    self.executed += 1
+                call['done'].set()
+        else:
+            call['done'].wait()
+
+        if call['error'] is not None:
+            raise call['error']
+        return call['result']
+
+    def stats(self):
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
+
+
+# Model loads and on-demand training share one coalescing group
+model_flight = SingleFlight()
+
+class CrimePredictor:
+    def __init__(self, exclude_anomalies=False):
+        # crime type -> (model, encoders fitted for it)
         self.models = {}
-        self.encoders = {}
         self.features = ['States/UTs', 'District', 'Year']
+        self.exclude_anomalies = exclude_anomalies
         
     def prepare_data(self, crime_type='Total_Crimes'):
-        """Prepare data for training"""
+        """Prepare data for training
+
+        Returns the features, target and the encoders fitted for them. The
+        encoders are new objects so that a running prediction never sees
+        them half fitted; train_model stores them together with the model.
+        """
+        from sklearn.preprocessing import LabelEncoder
+
         df = pd.read_csv('data/crime_data.csv')
         
         # Filter relevant columns
@@ -25,19 +93,30 @@ class CrimePredictor:
         crime_data = crime_data.dropna()
         
         # Encode categorical variables
+        encoders = {}
         for col in ['States/UTs', 'District']:
-            if col not in self.encoders:
-                self.encoders[col] = LabelEncoder()
-            crime_data[col] = self.encoders[col].fit_transform(crime_data[col])
+            encoders[col] = LabelEncoder()
+            crime_data[col] = encoders[col].fit_transform(crime_data[col])
+        
+        # Drop rows flagged by the anomaly checks after encoding, so flagged
+        # districts can still be predicted. Predictors pickled before this
+        # option existed have no attribute and keep all rows.
+        if getattr(self, 'exclude_anomalies', False):
+            flagged = detect_anomalies(df)['is_anomaly']
+            crime_data = crime_data[~flagged.reindex(crime_data.index)]
         
         X = crime_data[['States/UTs', 'District', 'Year']]
         y = crime_data[crime_type]
         
-        return X, y
+        return X, y, encoders
     
     def train_model(self, crime_type='Total_Crimes'):
         """Train model for specific crime type"""
-        X, y = self.prepare_data(crime_type)
+        from sklearn.model_selection import train_test_split
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.metrics import mean_absolute_error, r2_score
+
+        X, y, encoders = self.prepare_data(crime_type)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -51,44 +130,115 @@ class CrimePredictor:
         mae = mean_absolute_error(y_test, y_pred)
         r2 = r2_score(y_test, y_pred)
         
-        self.models[crime_type] = model
+        with _model_lock:
+            self.models[crime_type] = (model, encoders)
         
         return {'mae': mae, 'r2': r2, 'model': model}
     
+    def get_model(self, crime_type='Total_Crimes'):
+        """Model and matching encoders, training the model once if missing"""
+        def train():
+            # A caller that missed just before the last training finished
+            # becomes a new leader; it must not train again
+            with _model_lock:
+                entry = self.models.get(crime_type)
+            if entry is None:
+                self.train_model(crime_type)
+                with _model_lock:
+                    entry = self.models[crime_type]
+            return entry
+
+        with _model_lock:
+            entry = self.models.get(crime_type)
+        if entry is None:
+            entry = model_flight.do(('train', id(self), crime_type), train)
+        if not isinstance(entry, tuple):
+            # Predictors pickled before encoders were stored per model keep
+            # one shared set on the predictor
+            entry = (entry, self.encoders)
+        return entry
+    
     def predict(self, state, district, crime_type='Total_Crimes', year=2015):
         """Predict crime for given parameters"""
-        if crime_type not in self.models:
-            self.train_model(crime_type)
+        model, encoders = self.get_model(crime_type)
         
         # Encode state and district
-        state_encoded = self.encoders['States/UTs'].transform([state])[0]
-        district_encoded = self.encoders['District'].transform([district])[0]
+        state_encoded = encoders['States/UTs'].transform([state])[0]
+        district_encoded = encoders['District'].transform([district])[0]
         
         # Prepare input
         input_data = np.array([[state_encoded, district_encoded, year]])
         
         # Predict
-        prediction = self.models[crime_type].predict(input_data)[0]
+        prediction = model.predict(input_data)[0]
         
         return max(0, prediction)  # Ensure non-negative prediction
 
-def train_crime_model():
+def train_crime_model(exclude_anomalies=False):
     """Train the crime prediction model"""
-    predictor = CrimePredictor()
+    import joblib
+    global _predictor
+
+    predictor = CrimePredictor(exclude_anomalies=exclude_anomalies)
     
     # Train for total crimes
     results = predictor.train_model('Total_Crimes')
     print(f"Model trained - MAE: {results['mae']:.2f}, R2: {results['r2']:.2f}")
     
     # Save model
-    joblib.dump(predictor, 'models/crime_model.pkl')
+    with _model_lock:
+        joblib.dump(predictor, MODEL_PATH)
+    _predictor = predictor
     
     return predictor
 
+def load_predictor():
+    """Load the saved predictor on first use and keep it for later requests"""
+    def load():
+        # Assign before the flight ends, so a late caller finds the
+        # predictor instead of loading it again
+        global _predictor
+        with _model_lock:
+            predictor = _predictor
+        if predictor is None:
+            import joblib
+            predictor = joblib.load(MODEL_PATH)
+            with _model_lock:
+                _predictor = predictor
+        return predictor
+
+    with _model_lock:
+        predictor = _predictor
+    if predictor is None:
+        predictor = model_flight.do(('load', MODEL_PATH), load)
+    return predictor
+
+def get_model_stats():
+    """Loaded models and how many duplicate loads or trainings were avoided"""
+    stats = model_flight.stats()
+    with _model_lock:
+        stats['loaded_models'] = sorted(_predictor.models) if _predictor is not None else []
+    return stats
+
+def warm_up():
+    """Import sklearn and load the saved model ahead of the first prediction"""
+    try:
+        import sklearn.ensemble
+        load_predictor()
+        print("Model warm-up completed")
+    except Exception as e:
+        print(f"Model warm-up failed: {e}")
+
+def start_background_warm_up():
+    """Run warm_up in a daemon thread so startup is not blocked"""
+    thread = threading.Thread(target=warm_up, name='model-warm-up', daemon=True)
+    thread.start()
+    return thread
+
 def predict_crime(state, district, crime_type='Total_Crimes', year=2015):
     """Predict crime rate"""
     try:
-        predictor = joblib.load('models/crime_model.pkl')
+        predictor = load_predictor()
         prediction = predictor.predict(state, district, crime_type, year)
         
         return {
@@ -109,22 +259,19 @@ def predict_crime(state, district, crime_type='Total_Crimes', year=2015):
             'predicted_crimes': 100,  # Default fallback
             'confidence': 'medium'
         }
-def get_crime_insights(state='All', district='All', crime_type='Total_Crimes', year=2014):
+def get_crime_insights(state='All', district='All', crime_type='Total_Crimes', year=2014, store=None):
     """Generate crime insights and policy recommendations based on specific parameters"""
     try:
-        df = pd.read_csv('data/crime_data.csv')
+        if store is None:
+            from storage import PandasStorage
+            store = PandasStorage(pd.read_csv('data/crime_data.csv'))
         
         # Filter data based on parameters
-        filtered_df = df.copy()
-        
-        if state != 'All':
-            filtered_df = filtered_df[filtered_df['States/UTs'] == state]
-        
-        if district != 'All':
-            filtered_df = filtered_df[filtered_df['District'] == district]
-        
-        if year != 'All':
-            filtered_df = filtered_df[filtered_df['Year'] == int(year)]
+        filtered_df = store.rows({
+            'States/UTs': None if state == 'All' else state,
+            'District': None if district == 'All' else district,
+            'Year': None if year == 'All' else int(year)
+        })
         
         insights = {
             'top_crimes': {},
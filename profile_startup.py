@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import time
+
+# Child process that imports the app and serves the first page request
+FIRST_REQUEST = """
+import time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.app.test_client().get('/')
+served = time.perf_counter()
+print(f"{imported - start:.6f} {served - start:.6f}")
+"""
+
+
+def parse_importtime(stderr):
+    """Parse `python -X importtime` output into (module, self_us, cumulative_us)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile_startup(top=15, warmup=False):
+    """Import the app in a fresh interpreter and report where startup time goes"""
+    env = dict(os.environ)
+    if warmup:
+        env['CRIME_APP_WARMUP'] = '1'
+
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', FIRST_REQUEST],
+                            capture_output=True, text=True, env=env)
+    total = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(result.returncode)
+
+    import_s, first_page_s = map(float, result.stdout.strip().splitlines()[-1].split())
+    rows = parse_importtime(result.stderr)
+
+    print(f"Process wall time:     {total:.3f}s")
+    print(f"Import app:            {import_s:.3f}s")
+    print(f"First '/' response:    {first_page_s:.3f}s")
+    print()
+    print(f"Top {top} imports by cumulative time:")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {module}")
+
+    loaded = {module.split('.')[0] for module, _, _ in rows}
+    print()
+    for name in ['sklearn', 'joblib', 'folium', 'geopy', 'scipy']:
+        print(f"{name:<8} imported at startup: {'yes' if name in loaded else 'no'}")
+
+
+if __name__ == '__main__':
+    profile_startup(warmup='--warmup' in sys.argv)
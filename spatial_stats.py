@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0
+
+# Two-sided 95% critical value for Gi* z-scores
+SIGNIFICANT_Z = 1.96
+
+
+def _unit_vectors(latitudes, longitudes):
+    """Lat/lon in degrees to points on the unit sphere"""
+    lat = np.radians(latitudes)
+    lon = np.radians(longitudes)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def build_neighbor_matrix(latitudes, longitudes, k=8, band_km=None):
+    """Sparse binary neighbor matrix without self links.
+
+    With band_km set, districts within that great-circle distance are
+    neighbors; otherwise each district is linked to its k nearest. The
+    k-nearest relation is symmetrized so that Moran's I is well defined.
+    """
+    from scipy import sparse
+    from scipy.spatial import cKDTree
+
+    points = _unit_vectors(latitudes, longitudes)
+    n = len(points)
+    tree = cKDTree(points)
+
+    if band_km is not None:
+        # Chord length on the unit sphere for the given arc distance
+        chord = 2 * np.sin(band_km / EARTH_RADIUS_KM / 2)
+        pairs = tree.query_pairs(chord, output_type='ndarray')
+        rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    else:
+        k = min(k, n - 1)
+        if k < 1:
+            return sparse.csr_matrix((n, n))
+        _, idx = tree.query(points, k=k + 1)
+        # Drop self links and keep the first k remaining neighbors. Points
+        # at identical coordinates can push a point out of its own list.
+        not_self = idx != np.arange(n)[:, None]
+        first_k = np.argsort(~not_self, axis=1, kind='stable')[:, :k]
+        neighbors = np.take_along_axis(idx, first_k, axis=1)
+        rows = np.repeat(np.arange(n), k)
+        cols = neighbors.ravel()
+        # Symmetrize so Moran's I is well defined
+        rows, cols = np.concatenate([rows, cols]), np.concatenate([cols, rows])
+
+    weights = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+    weights.data[:] = 1.0
+    return weights
+
+
+class SpatialHotspots:
+    """Getis-Ord Gi* and local Moran's I over a fixed district neighbor graph.
+
+    The neighbor matrix is built once from district coordinates. Statistics
+    for every crime column are then computed together as sparse matrix
+    products against the (district, crime type) value matrix.
+    """
+
+    def __init__(self, locations, k=8, band_km=None):
+        self.locations = locations.reset_index(drop=True)
+        self.weights = build_neighbor_matrix(self.locations['latitude'].to_numpy(),
+                                             self.locations['longitude'].to_numpy(),
+                                             k=k, band_km=band_km)
+        self.results = {}
+
+    def compute(self, values):
+        """Compute statistics for all columns of a (district x crime) frame
+
+        `values` is indexed by (state, district) and is aligned to the
+        neighbor graph; districts missing from it count as zero.
+        """
+        from scipy import sparse
+        from scipy.special import ndtr
+
+        keys = list(zip(self.locations['state'], self.locations['district']))
+        X = values.reindex(pd.MultiIndex.from_tuples(keys)).fillna(0).to_numpy(dtype=float)
+        n = X.shape[0]
+
+        # Gi* includes each district in its own neighborhood
+        W_star = self.weights + sparse.identity(n, format='csr')
+        w_sum = np.asarray(W_star.sum(axis=1)).ravel()[:, None]
+        w_sq_sum = np.asarray(W_star.multiply(W_star).sum(axis=1)).ravel()[:, None]
+
+        mean = X.mean(axis=0)
+        std = np.sqrt((X ** 2).mean(axis=0) - mean ** 2)
+        denom = std * np.sqrt((n * w_sq_sum - w_sum ** 2) / max(n - 1, 1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gi_star = (W_star @ X - mean * w_sum) / denom
+        gi_star = np.nan_to_num(gi_star)
+
+        # Local Moran's I with a row-standardized matrix
+        row_sum = np.asarray(self.weights.sum(axis=1)).ravel()
+        inv_row_sum = np.divide(1.0, row_sum, out=np.zeros_like(row_sum), where=row_sum > 0)
+        W_row = sparse.diags(inv_row_sum) @ self.weights
+        z = X - mean
+        m2 = (z ** 2).mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            local_moran = z / m2 * (W_row @ z)
+        local_moran = np.nan_to_num(local_moran)
+
+        self.results = {
+            'columns': list(values.columns),
+            'values': X,
+            'gi_star': gi_star,
+            'p_value': 2 * ndtr(-np.abs(gi_star)),
+            'local_moran': local_moran,
+        }
+        return self.results
+
+    def hotspots(self, crime_type, state='All', limit=30):
+        """Districts ranked by Gi* z-score for one crime type, highest first"""
+        columns = self.results['columns']
+        if crime_type not in columns:
+            crime_type = 'Total_Crimes'
+        c = columns.index(crime_type)
+
+        gi = self.results['gi_star'][:, c]
+        rows = np.arange(len(gi))
+        if state != 'All':
+            rows = rows[(self.locations['state'] == state).to_numpy()]
+        rows = rows[np.argsort(-gi[rows], kind='stable')][:limit]
+
+        hotspots = []
+        for i in rows:
+            loc = self.locations.iloc[i]
+            z_score = float(gi[i])
+            if z_score >= SIGNIFICANT_Z:
+                cluster = 'hot'
+            elif z_score <= -SIGNIFICANT_Z:
+                cluster = 'cold'
+            else:
+                cluster = 'not significant'
+            hotspots.append({
+                'state': loc['state'],
+                'district': loc['district'],
+                'crime_count': int(self.results['values'][i, c]),
+                'z_score': round(z_score, 3),
+                'p_value': round(float(self.results['p_value'][i, c]), 4),
+                'local_moran': round(float(self.results['local_moran'][i, c]), 3),
+                'cluster': cluster,
+                'latitude': float(loc['latitude']),
+                'longitude': float(loc['longitude'])
+            })
+        return hotspots
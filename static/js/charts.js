@@ -123,6 +123,61 @@ class ChartManager {
         Plotly.newPlot(elementId, [trace], layout);
     }
 
+    createComparisonChart(elementId, comparison, options = {}) {
+        // comparison is the /api/compare response; one bar group per label
+        const metric = options.metric || 'totals';
+        const traces = comparison.crime_types.map((crimeType, i) => ({
+            x: comparison.labels,
+            y: comparison[metric][crimeType],
+            name: crimeType,
+            type: 'bar',
+            marker: {
+                color: this.colors[i % this.colors.length]
+            }
+        }));
+
+        const layout = {
+            title: options.title || '',
+            barmode: 'group',
+            xaxis: {
+                title: options.xLabel || '',
+                tickangle: options.tickAngle || 0
+            },
+            yaxis: {
+                title: options.yLabel || ''
+            }
+        };
+
+        Plotly.newPlot(elementId, traces, layout);
+    }
+
+    createComparisonTrendChart(elementId, comparison, crimeType, options = {}) {
+        const values = comparison.trends.values[crimeType] || {};
+        const traces = comparison.labels.map((label, i) => ({
+            x: comparison.trends.years,
+            y: values[label] || [],
+            name: label,
+            type: 'scatter',
+            mode: 'lines+markers',
+            line: {
+                color: this.colors[i % this.colors.length],
+                width: 3
+            }
+        }));
+
+        const layout = {
+            title: options.title || '',
+            xaxis: {
+                title: options.xLabel || 'Year'
+            },
+            yaxis: {
+                title: options.yLabel || crimeType
+            }
+        };
+
+        Plotly.newPlot(elementId, traces, layout);
+    }
+
     updateChart(elementId, newData) {
         Plotly.react(elementId, newData.data, newData.layout);
     }
@@ -0,0 +1,228 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+from dataset import DATA_PATH
+
+DB_PATH = 'data/crime_data.db'
+
+TABLE = 'crimes'
+
+
+class PandasStorage:
+    """Storage backend over an in-memory DataFrame of the whole dataset.
+
+    Both backends answer the same small set of queries and return results in
+    the same shape, so callers can post-process them with pandas either way.
+    Filters map column names to a required value, or to a list of allowed
+    values; None means no filter.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = list(df.columns)
+
+    def _filter(self, filters):
+        data = self.df
+        for column, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                data = data[data[column].isin(value)]
+            elif value is not None:
+                data = data[data[column] == value]
+        return data
+
+    def rows(self, filters=None, columns=None):
+        """Matching rows, in dataset order"""
+        data = self._filter(filters)
+        return data[columns] if columns else data
+
+    def group_sum(self, by, column, filters=None):
+        """Sum of a column (or frame of sums of a list of columns) per group"""
+        return self._filter(filters).groupby(by)[column].sum()
+
+    def aggregate(self, by, columns, filters=None):
+        """Sum and count of non-missing values per group, as (column, 'sum'|'count')"""
+        return self._filter(filters).groupby(by)[columns].agg(['sum', 'count'])
+
+    def distinct(self, column, filters=None):
+        """Sorted distinct values of a column, or tuples for a list of columns"""
+        data = self._filter(filters)
+        if isinstance(column, list):
+            return sorted(data[column].drop_duplicates().itertuples(index=False, name=None))
+        return sorted(data[column].unique())
+
+
+class ConnectionPool:
+    """Per-process pool of read-only SQLite connections.
+
+    Connections are created on demand up to `size` and reused. A pool
+    inherited across fork() is discarded, since SQLite connections must not
+    be shared between processes.
+    """
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self.size = size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+
+    def _connect(self):
+        uri = f"file:{os.path.abspath(self.path)}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            pool = self._idle
+            create = pool.empty() and self._created < self.size
+            if create:
+                self._created += 1
+
+        if create:
+            conn = self._connect()
+        else:
+            conn = pool.get()
+
+        try:
+            yield conn
+        finally:
+            if pool is self._idle:
+                pool.put(conn)
+            else:
+                conn.close()
+
+
+def quote(column):
+    """Quote a column name for SQL; dataset names contain '/' and spaces"""
+    return '"' + column.replace('"', '""') + '"'
+
+
+class SQLiteStorage:
+    """Storage backend that pushes filters and group-bys down to SQLite.
+
+    Rows are indexed on (state, district, year) and on year, so every query
+    only reads the matching rows and memory is bounded by the result size.
+    """
+
+    def __init__(self, db_path=DB_PATH, pool_size=4):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, pool_size)
+        with self.pool.connection() as conn:
+            self.columns = [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE})")]
+
+    @classmethod
+    def build(cls, csv_path=DATA_PATH, db_path=DB_PATH, chunksize=50000):
+        """Import the CSV into SQLite in chunks and create the indexes"""
+        tmp_path = f"{db_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+                chunk.to_sql(TABLE, conn, if_exists='append', index=False)
+            conn.execute(f"CREATE INDEX idx_{TABLE}_location ON {TABLE} "
+                         f"({quote('States/UTs')}, {quote('District')}, {quote('Year')})")
+            conn.execute(f"CREATE INDEX idx_{TABLE}_year ON {TABLE} ({quote('Year')})")
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, db_path)
+
+    @classmethod
+    def open(cls, csv_path=DATA_PATH, db_path=DB_PATH, pool_size=4):
+        """Open the database, rebuilding it first if the CSV is newer"""
+        if (not os.path.exists(db_path)
+                or os.path.getmtime(db_path) < os.path.getmtime(csv_path)):
+            cls.build(csv_path, db_path)
+        return cls(db_path, pool_size)
+
+    def _check(self, columns):
+        for column in columns:
+            if column not in self.columns:
+                raise KeyError(f"Unknown column: {column}")
+
+    def _where(self, filters):
+        filters = {c: v for c, v in (filters or {}).items() if v is not None}
+        self._check(filters)
+        if not filters:
+            return '', []
+        conditions, params = [], []
+        for column, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                # 'IN ()' is not valid SQL; an empty list matches nothing
+                placeholders = ', '.join('?' * len(values)) or 'NULL'
+                conditions.append(f"{quote(column)} IN ({placeholders})")
+            else:
+                values = [value]
+                conditions.append(f"{quote(column)} = ?")
+            params.extend(v.item() if hasattr(v, 'item') else v for v in values)
+        return f" WHERE {' AND '.join(conditions)}", params
+
+    def _query(self, sql, params):
+        with self.pool.connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def rows(self, filters=None, columns=None):
+        """Matching rows, in dataset order"""
+        columns = columns or self.columns
+        self._check(columns)
+        where, params = self._where(filters)
+        select = ', '.join(quote(c) for c in columns)
+        return self._query(f"SELECT {select} FROM {TABLE}{where} ORDER BY rowid", params)
+
+    def _group_query(self, by, aggregates, filters):
+        by = [by] if isinstance(by, str) else list(by)
+        where, params = self._where(filters)
+        keys = ', '.join(quote(c) for c in by)
+        sql = (f"SELECT {keys}, {', '.join(aggregates)} "
+               f"FROM {TABLE}{where} GROUP BY {keys} ORDER BY {keys}")
+        return self._query(sql, params).set_index(by if len(by) > 1 else by[0])
+
+    def group_sum(self, by, column, filters=None):
+        """Sum of a column (or frame of sums of a list of columns) per group"""
+        columns = column if isinstance(column, list) else [column]
+        self._check(([by] if isinstance(by, str) else list(by)) + columns)
+        aggregates = [f"COALESCE(SUM({quote(c)}), 0) AS {quote(c)}" for c in columns]
+        return self._group_query(by, aggregates, filters)[column]
+
+    def aggregate(self, by, columns, filters=None):
+        """Sum and count of non-missing values per group, as (column, 'sum'|'count')"""
+        self._check(([by] if isinstance(by, str) else list(by)) + columns)
+        aggregates = []
+        for i, c in enumerate(columns):
+            aggregates += [f"COALESCE(SUM({quote(c)}), 0) AS sum_{i}", f"COUNT({quote(c)}) AS count_{i}"]
+        result = self._group_query(by, aggregates, filters)
+        result.columns = pd.MultiIndex.from_product([columns, ['sum', 'count']])
+        return result
+
+    def distinct(self, column, filters=None):
+        """Sorted distinct values of a column, or tuples for a list of columns"""
+        columns = column if isinstance(column, list) else [column]
+        self._check(columns)
+        where, params = self._where(filters)
+        select = ', '.join(quote(c) for c in columns)
+        sql = f"SELECT DISTINCT {select} FROM {TABLE}{where} ORDER BY {select}"
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return rows if isinstance(column, list) else [row[0] for row in rows]
+
+
+def create_storage(backend='pandas', df=None, csv_path=DATA_PATH, db_path=DB_PATH):
+    """Storage backend by name: 'pandas' (default) or 'sqlite'"""
+    if backend == 'sqlite':
+        return SQLiteStorage.open(csv_path, db_path)
+    if backend == 'pandas':
+        return PandasStorage(df if df is not None else pd.read_csv(csv_path))
+    raise ValueError(f"Unknown storage backend: {backend}")
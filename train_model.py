@@ -1,6 +1,7 @@
+import sys
 from ml_model import train_crime_model
 
 if __name__ == '__main__':
     print("Training crime prediction model...")
-    predictor = train_crime_model()
+    predictor = train_crime_model(exclude_anomalies='--exclude-anomalies' in sys.argv)
     print("Model training completed!")
\ No newline at end of file